@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Offline step that builds the profession taxonomy used by main.py.
+
+Encodes every profession in demo.csv, clusters the embeddings into labelled
+categories and saves the embeddings, centroids and member lists to
+taxonomy.pt. Re-run this whenever demo.csv or the model changes; main.py
+falls back to encoding the whole directory per query if the file is missing
+or stale, and picks up a rebuilt file without a restart.
+
+Before saving, it checks on a set of sample queries that scoring only the
+nearest clusters gives the same results as a full scan. The file is only
+written if the check passes, and is written atomically so a running app
+never reads a partial file.
+
+Usage:
+    python build_taxonomy.py
+"""
+
+import os
+import sys
+
+import pandas as pd
+import torch
+from sentence_transformers import SentenceTransformer, util
+
+from search_index import (CLUSTERS_TO_SEARCH, DATA_FILE, MAX_RESULTS, MODEL_NAME,
+                          TAXONOMY_FILE, THRESHOLD, cluster_radii, pruned_search, search)
+
+# Candidate category labels. Each one seeds a cluster centroid; categories
+# that end up with no members are dropped.
+CATEGORIES = [
+    "Engineering",
+    "Technology & Data",
+    "Health",
+    "Food & Catering",
+    "Media & Photography",
+    "Fashion & Beauty",
+    "Education",
+    "Finance & Accounting",
+    "Legal",
+    "Construction & Artisans",
+    "Transport & Logistics",
+    "Business & Marketing",
+    "Events & Entertainment",
+    "Agriculture",
+]
+
+MAX_ITERATIONS = 20
+
+# Sample queries for comparing pruned and full-scan search
+CHECK_QUERIES = [
+    "caterer",
+    "baker for a birthday cake",
+    "data scientist",
+    "machine learning engineer",
+    "photographer",
+    "media services",
+    "electrician",
+    "plumber",
+    "accountant",
+    "web designer",
+    "marketing consultant",
+    "driver",
+    "chef",
+    "enginer",
+    "someone to fix my generator",
+]
+
+
+def cluster(embeddings, seeds):
+    """Spherical k-means over normalized embeddings, seeded with `seeds`.
+
+    Returns (centroids, assignments) where assignments[i] is the cluster of
+    embeddings[i].
+    """
+    centroids = seeds.clone()
+    assignments = None
+
+    for _ in range(MAX_ITERATIONS):
+        new_assignments = util.cos_sim(embeddings, centroids).argmax(dim=1)
+        if assignments is not None and torch.equal(new_assignments, assignments):
+            break
+        assignments = new_assignments
+
+        # Move each non-empty centroid to the mean of its members
+        for c in range(len(centroids)):
+            mask = assignments == c
+            if mask.any():
+                centroids[c] = torch.nn.functional.normalize(embeddings[mask].mean(dim=0), dim=0)
+
+    return centroids, assignments
+
+
+def check(model, taxonomy):
+    """Compare the pruned pass against a full scan on CHECK_QUERIES.
+
+    Also confirms that search(), which adds back clusters by score bound,
+    always matches the full scan. Returns the queries whose results differ.
+    """
+    mismatches = []
+    for query in CHECK_QUERIES:
+        query_embedding = model.encode(query, convert_to_tensor=True)
+        full = search(query_embedding, taxonomy, THRESHOLD, MAX_RESULTS)
+        pruned = pruned_search(query_embedding, taxonomy, THRESHOLD, MAX_RESULTS, CLUSTERS_TO_SEARCH)
+        bounded = search(query_embedding, taxonomy, THRESHOLD, MAX_RESULTS, CLUSTERS_TO_SEARCH)
+        expected = [idx for idx, _ in full]
+        if [idx for idx, _ in pruned] != expected or [idx for idx, _ in bounded] != expected:
+            mismatches.append(query)
+    return mismatches
+
+
+def main():
+    model = SentenceTransformer(MODEL_NAME)
+    df = pd.read_csv(DATA_FILE)
+
+    profession_texts = df['PROFESSION'].fillna('').astype(str).tolist()
+    embeddings = model.encode(profession_texts, convert_to_tensor=True,
+                              normalize_embeddings=True).cpu()
+    seeds = model.encode(CATEGORIES, convert_to_tensor=True,
+                         normalize_embeddings=True).cpu()
+
+    centroids, assignments = cluster(embeddings, seeds)
+    radii = cluster_radii(embeddings, centroids, assignments)
+
+    # Keep only categories with members
+    labels, kept_centroids, kept_radii, members = [], [], [], []
+    for c, label in enumerate(CATEGORIES):
+        member_indices = (assignments == c).nonzero(as_tuple=True)[0].tolist()
+        if member_indices:
+            labels.append(label)
+            kept_centroids.append(centroids[c])
+            kept_radii.append(radii[c])
+            members.append(member_indices)
+
+    taxonomy = {
+        'model': MODEL_NAME,
+        'professions': profession_texts,
+        'embeddings': embeddings,
+        'labels': labels,
+        'centroids': torch.stack(kept_centroids),
+        'radii': torch.stack(kept_radii),
+        'members': members,
+    }
+
+    print(f"Built {len(labels)} categories for {len(profession_texts)} professionals:")
+    for label, member_indices in zip(labels, members):
+        print(f"  {label}: {len(member_indices)}")
+
+    mismatches = check(model, taxonomy)
+    if mismatches:
+        print(f"Pruned search differs from a full scan for: {', '.join(mismatches)}")
+        print(f"Not saving {TAXONOMY_FILE}; try a larger CLUSTERS_TO_SEARCH.")
+        sys.exit(1)
+    print(f"Pruned search matches a full scan for all {len(CHECK_QUERIES)} sample queries.")
+
+    # Write to a temporary file and swap it in so readers never see a partial file
+    tmp_file = TAXONOMY_FILE + '.tmp'
+    torch.save(taxonomy, tmp_file)
+    os.replace(tmp_file, TAXONOMY_FILE)
+    print(f"Saved {TAXONOMY_FILE}")
+
+
+if __name__ == '__main__':
+    main()
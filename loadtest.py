@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+Load-testing harness for the GICC Finder Streamlit app.
+
+Starts one `streamlit run main.py` server and drives many simulated browser
+sessions against it over Streamlit's websocket protocol. For each
+concurrency level it reports per-rerun latency percentiles, throughput and
+the server process's peak RSS, i.e. how one app instance behaves as more
+users share it.
+
+Requires the `websockets` package (installed with recent Streamlit
+versions) and, outside Linux, `psutil` for the RSS column.
+
+Usage:
+    python loadtest.py --levels 1 2 4 8 --sessions 16
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(APP_DIR, 'main.py')
+
+# Realistic query mix: common trades, multi-word descriptions, typos and
+# queries with no good match. None means a plain page reload with no new
+# search.
+QUERY_MIX = [
+    None,
+    "caterer",
+    "baker for a birthday cake",
+    "data scientist",
+    "machine learning engineer",
+    "photographer",
+    "media services",
+    "electrician",
+    "plumber",
+    "accountant",
+    "web designer",
+    "marketing consultant",
+    "driver",
+    "chef",
+    "enginer",
+    "someone to fix my generator",
+]
+
+# Script run outcomes that end a rerun (anything else means another rerun
+# replaced it and we keep waiting)
+FINISHED = {
+    ForwardMsg.FINISHED_SUCCESSFULLY: True,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR: False,
+}
+
+
+def rss_mb(pid):
+    """Resident set size of process `pid` in MB, or nan if unavailable."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return float('nan')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Session:
+    """One simulated browser tab connected to the server's websocket."""
+
+    def __init__(self, ws, timeout):
+        self.ws = ws
+        self.timeout = timeout
+        self.search_widget_id = None
+        self.query = None
+
+    async def rerun(self):
+        """Ask the server to rerun the script and wait for it to finish.
+
+        Returns (latency_seconds, ok).
+        """
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = ""
+        if self.search_widget_id is not None and self.query is not None:
+            widget = msg.rerun_script.widget_states.widgets.add()
+            widget.id = self.search_widget_id
+            widget.string_value = self.query
+
+        start = time.perf_counter()
+        try:
+            ok = await asyncio.wait_for(self._send_and_wait(msg), self.timeout)
+        except (asyncio.TimeoutError, websockets.ConnectionClosed):
+            ok = False
+        return time.perf_counter() - start, ok
+
+    async def _send_and_wait(self, msg):
+        await self.ws.send(msg.SerializeToString())
+        ok = True
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await self.ws.recv())
+            kind = reply.WhichOneof('type')
+
+            if kind == 'delta' and reply.delta.WhichOneof('type') == 'new_element':
+                element = reply.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    ok = False
+                elif element_type == 'text_input' and self.search_widget_id is None:
+                    # Widget IDs are assigned by the server; learn the search
+                    # box's from the first page render
+                    self.search_widget_id = element.text_input.id
+
+            elif kind == 'script_finished' and reply.script_finished in FINISHED:
+                return ok and FINISHED[reply.script_finished]
+
+
+async def run_session(url, queries, timeout):
+    """Simulate one user: load the page, then search each query.
+
+    Returns a list of (latency_seconds, ok) tuples, one per rerun.
+    """
+    try:
+        async with websockets.connect(url, max_size=None, open_timeout=timeout) as ws:
+            session = Session(ws, timeout)
+            reruns = [await session.rerun()]
+            for query in queries:
+                if query is not None:
+                    session.query = query
+                reruns.append(await session.rerun())
+            return reruns
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+        return [(0.0, False)]
+
+
+async def sample_rss(pid, samples, interval=0.25):
+    """Append the server's RSS to `samples` until cancelled."""
+    while True:
+        samples.append(rss_mb(pid))
+        await asyncio.sleep(interval)
+
+
+async def run_level(url, pid, concurrency, sessions, queries_per_session, timeout, rng):
+    """Run `sessions` sessions with at most `concurrency` connected at once."""
+    plans = [rng.choices(QUERY_MIX, k=queries_per_session) for _ in range(sessions)]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def limited(plan):
+        async with slots:
+            return await run_session(url, plan, timeout)
+
+    rss_samples = []
+    sampler = asyncio.create_task(sample_rss(pid, rss_samples))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(limited(plan) for plan in plans))
+    wall = time.perf_counter() - start
+    sampler.cancel()
+
+    reruns = [r for session in results for r in session]
+    latencies = [latency for latency, ok in reruns if ok]
+    errors = len(reruns) - len(latencies)
+
+    return {
+        'concurrency': concurrency,
+        'reruns': len(reruns),
+        'errors': errors,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'mean': statistics.mean(latencies) if latencies else float('nan'),
+        'ok_rate': len(latencies) / wall if wall > 0 else float('nan'),
+        'error_rate': errors / wall if wall > 0 else float('nan'),
+        'rss_mb': max(rss_samples, default=float('nan')),
+    }
+
+
+def start_server(app_file, port, timeout):
+    """Start `streamlit run` in the background and wait until it is healthy."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', app_file,
+         '--server.headless', 'true',
+         '--server.port', str(port),
+         '--server.fileWatcherType', 'none',
+         '--browser.gatherUsageStats', 'false'],
+        # main.py reads demo.csv relative to the working directory
+        cwd=os.path.dirname(app_file),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"Streamlit server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.5)
+
+    server.terminate()
+    sys.exit(f"Streamlit server did not become healthy within {timeout:.0f}s")
+
+
+async def run(args, server):
+    url = f'ws://127.0.0.1:{args.port}/_stcore/stream'
+    rng = random.Random(args.seed)
+
+    # Warm-up session so model/data loading is not counted against level 1
+    print("Warming up (loading model and data)...")
+    warmup = await run_session(url, ["caterer"], args.timeout)
+    if not all(ok for _, ok in warmup):
+        sys.exit("Warm-up session failed; check that the app runs with `streamlit run`.")
+    print(f"Server RSS after warm-up: {rss_mb(server.pid):.0f} MB\n")
+
+    header = (f"{'conc':>5} {'reruns':>7} {'errors':>7} {'p50 ms':>8} {'p90 ms':>8} "
+              f"{'p99 ms':>8} {'mean ms':>8} {'ok/s':>8} {'err/s':>8} {'RSS MB':>8}")
+    print(header)
+    print('-' * len(header))
+
+    for concurrency in args.levels:
+        stats = await run_level(url, server.pid, concurrency, args.sessions,
+                                args.queries, args.timeout, rng)
+        print(f"{stats['concurrency']:>5} {stats['reruns']:>7} {stats['errors']:>7} "
+              f"{stats['p50'] * 1000:>8.0f} {stats['p90'] * 1000:>8.0f} "
+              f"{stats['p99'] * 1000:>8.0f} {stats['mean'] * 1000:>8.0f} "
+              f"{stats['ok_rate']:>8.2f} {stats['error_rate']:>8.2f} {stats['rss_mb']:>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the GICC Finder app.")
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="concurrency levels to test (default: 1 2 4 8)")
+    parser.add_argument('--sessions', type=int, default=16,
+                        help="simulated sessions per level (default: 16)")
+    parser.add_argument('--queries', type=int, default=3,
+                        help="queries per session (default: 3)")
+    parser.add_argument('--timeout', type=float, default=120,
+                        help="server start-up and per-rerun timeout in seconds (default: 120)")
+    parser.add_argument('--port', type=int, default=8599,
+                        help="port for the Streamlit server (default: 8599)")
+    parser.add_argument('--app', default=APP_FILE,
+                        help="Streamlit script to test (default: main.py)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="random seed for the query mix (default: 0)")
+    args = parser.parse_args()
+
+    server = start_server(os.path.abspath(args.app), args.port, args.timeout)
+    try:
+        asyncio.run(run(args, server))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,22 +5,33 @@ Created on Tue Jun 17 12:33:33 2025
 @author: Oreoluwa
 """
 
+import os
 import streamlit as st
 import pandas as pd
 from sentence_transformers import SentenceTransformer, util
 import time
 from streamlit.components.v1 import html
 from streamlit_extras.stylable_container import stylable_container
+import search_index
 
 # Load the model only once
 @st.cache_resource
 def load_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+    return SentenceTransformer(search_index.MODEL_NAME)
 
 # Load data only once
 @st.cache_data
 def load_data():    
-    return pd.read_csv('demo.csv')
+    return pd.read_csv(search_index.DATA_FILE)
+
+# Load the precomputed taxonomy (built by build_taxonomy.py) once per file
+# version; mtime is part of the cache key so a rebuild is picked up live, and
+# only the latest version is kept. Unreadable files give None.
+@st.cache_resource(max_entries=1)
+def load_taxonomy(mtime):
+    if mtime is None:
+        return None
+    return search_index.load_taxonomy()
 
 # Apply custom page config with wider layout
 st.set_page_config(
@@ -457,41 +468,72 @@ with stylable_container(
 # Load model and data
 model = load_model()
 df = load_data()
+profession_texts = df['PROFESSION'].fillna('').astype(str).tolist()
+
+# Only use the taxonomy if it was built with the current model and data
+try:
+    taxonomy_mtime = os.path.getmtime(search_index.TAXONOMY_FILE)
+except OSError:
+    taxonomy_mtime = None
+taxonomy = load_taxonomy(taxonomy_mtime)
+if taxonomy is not None and not search_index.is_current(taxonomy, profession_texts):
+    taxonomy = None
 
 # Configuration
-threshold = 0.5
-max_results = 10
+threshold = search_index.THRESHOLD
+max_results = search_index.MAX_RESULTS
+clusters_to_search = search_index.CLUSTERS_TO_SEARCH
+
+# Category browsing from precomputed member lists (no model call)
+browse_category = None
+if taxonomy is not None and not user_query:
+    browse_category = st.selectbox(
+        "Or browse by category",
+        taxonomy['labels'],
+        index=None,
+        placeholder="Choose a category...",
+        key="browse_category",
+    )
 
 # Process query if input exists
 if user_query:
     with st.spinner('🔍 Searching our network for the best professionals...'):
         try:
-            # Encode database professions
-            profession_texts = df['PROFESSION'].fillna('').astype(str).tolist()
-            profession_embeddings = model.encode(profession_texts, convert_to_tensor=True)
-
             # Encode query
             query_embedding = model.encode(user_query, convert_to_tensor=True)
 
-            # Compute cosine similarities
-            cosine_scores = util.cos_sim(query_embedding, profession_embeddings)[0]
-
-            # Create results with indices and scores
-            all_results = []
-            for idx, score in enumerate(cosine_scores):
-                score_value = score.item()
-                if score_value >= threshold:
-                    all_results.append({
-                        'score': score_value,
-                        'index': idx,
-                        'row': df.iloc[idx]
-                    })
-            
-            # Sort by score (highest first)
-            all_results.sort(key=lambda x: x['score'], reverse=True)
-            
-            # Limit results
-            top_results = all_results[:max_results]
+            if taxonomy is not None:
+                # Score the nearest clusters first, falling back to all
+                # precomputed embeddings if that finds too few matches
+                matches = search_index.search(query_embedding, taxonomy, threshold,
+                                              max_results, clusters_to_search)
+                top_results = [
+                    {'score': score, 'index': idx, 'row': df.iloc[idx]}
+                    for idx, score in matches
+                ]
+            else:
+                # Encode database professions
+                profession_embeddings = model.encode(profession_texts, convert_to_tensor=True)
+
+                # Compute cosine similarities
+                cosine_scores = util.cos_sim(query_embedding, profession_embeddings)[0]
+
+                # Create results with indices and scores
+                all_results = []
+                for idx, score in enumerate(cosine_scores):
+                    score_value = score.item()
+                    if score_value >= threshold:
+                        all_results.append({
+                            'score': score_value,
+                            'index': idx,
+                            'row': df.iloc[idx]
+                        })
+                
+                # Sort by score (highest first)
+                all_results.sort(key=lambda x: x['score'], reverse=True)
+                
+                # Limit results
+                top_results = all_results[:max_results]
             
         except Exception as e:
             st.error(f"Error during search: {str(e)}")
@@ -499,8 +541,23 @@ if user_query:
 
         time.sleep(0.5)
 
+elif browse_category:
+    # Members of the chosen category, closest to its centroid first
+    category = taxonomy['labels'].index(browse_category)
+    members = taxonomy['members'][category]
+    centroid_scores = util.cos_sim(taxonomy['centroids'][category], taxonomy['embeddings'][members])[0]
+    top_results = [
+        {'score': score.item(), 'index': idx, 'row': df.iloc[idx]}
+        for idx, score in zip(members, centroid_scores)
+    ]
+    top_results.sort(key=lambda x: x['score'], reverse=True)
+
+if user_query or browse_category:
     if top_results:
-        st.success(f"✨ Found {len(top_results)} qualified professional(s):")
+        if user_query:
+            st.success(f"✨ Found {len(top_results)} qualified professional(s):")
+        else:
+            st.success(f"📂 {len(top_results)} professional(s) in {browse_category}:")
         
         # Display results with responsive design
         for i, result in enumerate(top_results):
@@ -527,8 +584,12 @@ if user_query:
                 desktop_col1, desktop_col2 = st.columns([3, 1])
                 
                 with desktop_col1:
-                    st.markdown(f"<h3 class='professional-header'>🏆 #{i+1} - {row['NAME']}</h3>", 
-                              unsafe_allow_html=True)
+                    if user_query:
+                        st.markdown(f"<h3 class='professional-header'>🏆 #{i+1} - {row['NAME']}</h3>", 
+                                  unsafe_allow_html=True)
+                    else:
+                        st.markdown(f"<h3 class='professional-header'>👤 {row['NAME']}</h3>", 
+                                  unsafe_allow_html=True)
                     
                     # Professional details with responsive styling
                     st.markdown(f"""
@@ -543,25 +604,27 @@ if user_query:
                         </div>
                     """, unsafe_allow_html=True)
                 
-                with desktop_col2:
-                    # Responsive metric display
-                    st.markdown(f"""
-                        <div class='metric-container'>
-                            <div style='font-size: 1.2rem; font-weight: bold; color: var(--accent-primary);'>
-                                {score:.0%}
+                # Match score only makes sense for a search query
+                if user_query:
+                    with desktop_col2:
+                        # Responsive metric display
+                        st.markdown(f"""
+                            <div class='metric-container'>
+                                <div style='font-size: 1.2rem; font-weight: bold; color: var(--accent-primary);'>
+                                    {score:.0%}
+                                </div>
+                                <div style='font-size: 0.8rem; color: var(--text-secondary);'>
+                                    Match Score
+                                </div>
                             </div>
-                            <div style='font-size: 0.8rem; color: var(--text-secondary);'>
-                                Match Score
-                            </div>
-                        </div>
-                    """, unsafe_allow_html=True)
+                        """, unsafe_allow_html=True)
                 
-                # Progress bar with enhanced styling
-                st.markdown(f"""
-                <div class="progress-bar">
-                    <div class="progress-value" style="width: {score*100}%"></div>
-                </div>
-                """, unsafe_allow_html=True)
+                    # Progress bar with enhanced styling
+                    st.markdown(f"""
+                    <div class="progress-bar">
+                        <div class="progress-value" style="width: {score*100}%"></div>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
     else:
         st.error("🤔 No matching professionals found. Try:")
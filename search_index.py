@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Shared settings and helpers for the precomputed profession taxonomy.
+
+Used by main.py at query time and by build_taxonomy.py when building and
+checking taxonomy.pt, so both sides agree on the model, files and search.
+"""
+
+import torch
+from sentence_transformers import util
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+DATA_FILE = 'demo.csv'
+TAXONOMY_FILE = 'taxonomy.pt'
+
+# Search configuration
+THRESHOLD = 0.5
+MAX_RESULTS = 10
+CLUSTERS_TO_SEARCH = 3
+
+
+# Keys every taxonomy file must provide
+REQUIRED_KEYS = {'model', 'professions', 'embeddings', 'labels', 'centroids', 'radii', 'members'}
+
+# Slack for floating point error in the cluster score bound
+BOUND_EPSILON = 1e-6
+
+
+def load_taxonomy(path=TAXONOMY_FILE):
+    """Load a taxonomy saved by build_taxonomy.py (tensors, strings and lists only).
+
+    Returns None if the file is missing, unreadable or incomplete, so callers
+    can fall back to searching without it.
+    """
+    try:
+        taxonomy = torch.load(path, map_location='cpu', weights_only=True)
+    except Exception:
+        return None
+    if not isinstance(taxonomy, dict) or not REQUIRED_KEYS <= taxonomy.keys():
+        return None
+    return taxonomy
+
+
+def is_current(taxonomy, profession_texts):
+    """True if the taxonomy was built with MODEL_NAME from these professions."""
+    return taxonomy['model'] == MODEL_NAME and taxonomy['professions'] == profession_texts
+
+
+def cluster_radii(embeddings, centroids, assignments):
+    """Largest angle (radians) between each centroid and any of its members."""
+    radii = torch.zeros(len(centroids))
+    for c in range(len(centroids)):
+        mask = assignments == c
+        if mask.any():
+            cosines = util.cos_sim(centroids[c], embeddings[mask])[0].clamp(-1, 1)
+            radii[c] = torch.acos(cosines.min())
+    return radii
+
+
+def nearest_clusters(query_embedding, taxonomy, clusters_to_search):
+    """Indices of the clusters_to_search clusters closest to the query."""
+    centroid_scores = util.cos_sim(query_embedding.cpu(), taxonomy['centroids'])[0]
+    k = min(clusters_to_search, len(taxonomy['labels']))
+    return torch.topk(centroid_scores, k).indices.tolist()
+
+
+def pruned_search(query_embedding, taxonomy, threshold, max_results, clusters_to_search):
+    """Score only members of the clusters_to_search nearest clusters.
+
+    This is approximate: matches in other clusters are missed. search()
+    builds on it and adds back any cluster that could still contain results.
+    """
+    query_embedding = query_embedding.cpu()
+    searched = nearest_clusters(query_embedding, taxonomy, clusters_to_search)
+    matches = _score(query_embedding, taxonomy['embeddings'], _members(taxonomy, searched), threshold)
+    return matches[:max_results]
+
+
+def search(query_embedding, taxonomy, threshold, max_results, clusters_to_search=None):
+    """Score professions against a query using the precomputed embeddings.
+
+    If clusters_to_search is given, members of that many nearest clusters are
+    scored first. Each remaining cluster is then scored only if its members
+    could still make the results: no member can score above
+    cos(angle(query, centroid) - radius), so clusters whose bound is below
+    the threshold (or below the current max_results-th score) are skipped.
+    The results are therefore the same as a full scan, at the cost of scoring
+    only the clusters that can matter.
+
+    Returns (index, score) pairs above threshold, best first, at most
+    max_results long.
+    """
+    query_embedding = query_embedding.cpu()
+    embeddings = taxonomy['embeddings']
+
+    if clusters_to_search is None:
+        return _score(query_embedding, embeddings, range(len(embeddings)), threshold)[:max_results]
+
+    searched = nearest_clusters(query_embedding, taxonomy, clusters_to_search)
+    matches = pruned_search(query_embedding, taxonomy, threshold, max_results, clusters_to_search)
+
+    # Lowest score a result from an unsearched cluster would need
+    cutoff = threshold
+    if len(matches) >= max_results:
+        cutoff = max(threshold, matches[max_results - 1][1])
+
+    centroid_scores = util.cos_sim(query_embedding, taxonomy['centroids'])[0].clamp(-1, 1)
+    angles = torch.acos(centroid_scores)
+    bounds = torch.cos((angles - taxonomy['radii']).clamp(min=0))
+    remaining = [
+        c for c in range(len(taxonomy['labels']))
+        if c not in searched and bounds[c] + BOUND_EPSILON >= cutoff
+    ]
+    if remaining:
+        matches += _score(query_embedding, embeddings, _members(taxonomy, remaining), threshold)
+        matches.sort(key=lambda x: x[1], reverse=True)
+
+    return matches[:max_results]
+
+
+def _members(taxonomy, clusters):
+    """Sorted profession indices belonging to any of the given clusters."""
+    return sorted(idx for c in clusters for idx in taxonomy['members'][c])
+
+
+def _score(query_embedding, embeddings, candidates, threshold):
+    """(index, score) pairs for candidates scoring at least threshold, best first."""
+    candidates = list(candidates)
+    if not candidates:
+        return []
+    cosine_scores = util.cos_sim(query_embedding, embeddings[candidates])[0]
+    matches = [
+        (idx, score.item())
+        for idx, score in zip(candidates, cosine_scores)
+        if score.item() >= threshold
+    ]
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches